@@ -27,6 +27,27 @@ LED_PORT      = 'None'        # Port D16
 BUZZER_PORT   = 'None'        # Port D18
 DISPLAY_PORT  = 'None'     # Keep as 'I2C' if using LCD
 
+# --- ADAPTIVE SAMPLING ---
+# The node samples faster when readings move quickly or get close to an
+# alert limit, and slows down when the signal is flat or the Pi is busy/hot
+# (e.g. when Ollama is running on the same board).
+MIN_INTERVAL    = 0.5      # Fastest sampling (seconds)
+BASE_INTERVAL   = 1.0      # Starting sampling interval (seconds)
+MAX_INTERVAL    = 5.0      # Slowest sampling - minimum data resolution (seconds)
+CHANGE_FAST     = 0.05     # Change > 5% of the limit per second = "moving fast"
+NEAR_LIMIT      = 0.90     # Reading > 90% of its limit = "approaching alert"
+CPU_TEMP_LIMIT  = 70.0     # Back off above this SoC temp (Pi throttles at 80°C)
+CPU_LOAD_LIMIT  = 80       # Back off above this CPU %
+HOT_MIN_INTERVAL = 1.0     # Fastest sampling allowed while the Pi is hot/busy (seconds)
+
+# Alert limits the sampler watches (same values as the reference solution)
+ALERT_LIMITS = {
+    'env_temp': 28.0,      # °C
+    'env_humidity': 80,    # %
+    'moisture': 1200,      # Wet/Flooded
+    'light': 600,          # Lumens
+}
+
 # ==============================================================================
 # 🛠️ SYSTEM INITIALIZATION
 # ==============================================================================
@@ -135,6 +156,41 @@ def read_environment():
             
     return data
 
+def next_interval(interval, elapsed, prev_data, data, cpu, sys_temp):
+    """Picks how long to sleep before the next sample (elapsed = seconds since the last one)."""
+    moving_fast = False
+    near_alert = False
+    for key, limit in ALERT_LIMITS.items():
+        if key not in data or not limit: continue
+        try:
+            value = float(data[key])
+        except (TypeError, ValueError): continue
+        if value >= NEAR_LIMIT * limit:
+            near_alert = True
+        if key in prev_data:
+            try:
+                # Rate per second, so a shorter interval doesn't look "flatter"
+                change = abs(value - float(prev_data[key])) / limit / max(elapsed, 0.001)
+            except (TypeError, ValueError): continue
+            if change > CHANGE_FAST:
+                moving_fast = True
+
+    # 1. Signal: speed up on fast change / near alert, slow down when flat
+    if near_alert or moving_fast:
+        interval = interval / 2
+    else:
+        interval = interval * 1.5
+
+    # 2. Power/thermal: give the CPU back when the Pi is hot or busy
+    #    (raise the floor too, so a near-alert speed-up can't cancel it out)
+    min_interval = MIN_INTERVAL
+    if sys_temp > CPU_TEMP_LIMIT or cpu > CPU_LOAD_LIMIT:
+        interval = interval * 2
+        min_interval = max(MIN_INTERVAL, HOT_MIN_INTERVAL)
+
+    # 3. Keep within the configured bounds
+    return round(min(max(interval, min_interval), MAX_INTERVAL), 2)
+
 # ==============================================================================
 # 🔄 MAIN LOOP
 # ==============================================================================
@@ -143,10 +199,15 @@ try:
     sio.connect(SERVER_IP)
     print(f"🟢 ONLINE. Streaming Data...")
 
+    interval = BASE_INTERVAL
+    prev_env = {}
+    last_sample = time.time()
+
     while True:
         # 1. Gather Data
         cpu, sys_temp, ping = get_pi_stats()
         env_data = read_environment()
+        sample_time = time.time()
         
         # 2. Package & Send
         payload = {
@@ -160,7 +221,7 @@ try:
         sio.emit('telemetry_stream', payload)
         
         # Print for local debugging
-        print(f"Sent: {payload}")
+        print(f"Sent: {payload} | Interval: {interval}s")
 
         # ======================================================================
         # 🎓 STUDENT ZONE: AUTOMATION LOGIC
@@ -182,7 +243,11 @@ try:
         
         # ======================================================================
         
-        time.sleep(1)
+        # 3. Adaptive Sampling
+        interval = next_interval(interval, sample_time - last_sample, prev_env, env_data, cpu, sys_temp)
+        last_sample = sample_time
+        prev_env = {**prev_env, **env_data}  # Keep the last good reading if a sensor read failed
+        time.sleep(interval)
 
 except KeyboardInterrupt:
     print("\n🛑 Node Stopped.")
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import re
+import sys
+
+# ==========================================
+# 🗜️  KNOWLEDGE PRE-PROCESSOR
+# ==========================================
+# Run this ONCE after changing a .txt file:   python preprocess.py
+# It reads every knowledge file, strips boilerplate, and saves:
+#   - a short summary of each section
+#   - an index of exact facts (names, dates, amounts, codes...)
+# rag.py then sends only the parts that match your question to the AI,
+# instead of the whole file every time.
+
+CACHE_DIR = ".rag_cache"     # Saved next to the knowledge files
+CACHE_VERSION = 3            # Bump this if the format below changes
+SUMMARY_SENTENCES = 2        # Sentences kept per section summary
+MAX_FACTS = 12               # Facts sent to the AI per question
+MAX_SECTIONS = 3             # Section summaries sent to the AI per question
+MIN_MATCH = 0.5              # Share of question words the best section must contain
+                             # (weaker matches send the full cleaned text instead)
+
+# --- HEURISTICS (tuned on the bundled sample files - edit for your own data) ---
+BANNER_PHRASES = ["DO NOT SHARE"]                 # ALL-CAPS lines with these are dropped
+FACT_UNITS = ["mg", "lbs", "kg", "feet", "days?"]  # "400mg", "150 feet", "30 days"
+SAY_WORDS = ["say", "said", "claim", "told", "statement", "alibi"]  # "What did X say?"
+
+STOP_WORDS = {"the", "and", "for", "are", "was", "were", "what", "who", "where",
+              "when", "which", "does", "did", "this", "that", "with", "from",
+              "have", "has", "is", "in", "on", "of", "to", "a", "an", "it",
+              "be", "can", "you", "your", "my", "me", "do", "i", "about", "tell"}
+
+# Things worth keeping word-for-word
+FACT_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}"                          # 2088-04-12
+    r"|\b\d{1,2}:\d{2}\s?(?:AM|PM)?"              # 2:00 PM
+    r"|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.? \d{1,2}"
+    r"|[$£€]\s?\d|\d+\s?%|\d+\s?(?:" + "|".join(FACT_UNITS) + r")\b"
+    r"|\b[\w-]*\d[\w-]*-[\w-]+\b"                 # 7-7-BETA-9, 9921-X
+    r"|\S+@\S+"                                   # emails
+)
+KEY_VALUE = re.compile(r"^([A-Za-z][A-Za-z .'#()-]{0,30}):\s*(.+)$")
+NAME_PATTERN = re.compile(r"\b[A-Z][a-z]+(?:[ ]+[A-Z][a-z]+)+\b(?!:)")
+SPEAKER = re.compile(r"^([A-Z][A-Z .']{1,20}):\s+")
+# Whole-line banners only: "[SYSTEM LOG - ...]" or an ALL-CAPS line with a banner phrase
+BOILERPLATE = re.compile(r"^\[[^\]:]*\]$|^[^a-z]*(?:"
+                         + "|".join(map(re.escape, BANNER_PHRASES)) + r")[^a-z]*$")
+
+def file_hash(filename):
+    """SHA-256 of the file, so we know when the cache is out of date."""
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def stem(word):
+    """Crude word stem, so "raining"/"rain" and "movies"/"movie" match."""
+    for suffix in ("ing", "ed", "ly", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "ls":
+        word = word[:-1]  # "running" -> "runn" -> "run"
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]  # "movie" -> "movi", same as "movies"
+    return word
+
+def keywords(text):
+    """Stemmed lower-case words that are useful for matching (no short/common words)."""
+    words = re.findall(r"[a-z0-9][a-z0-9'-]*", text.lower())
+    return {stem(w) for w in words if len(w) > 2 and w not in STOP_WORDS}
+
+def split_sentences(text):
+    # Split after . ! ? (but not after list numbers like "1.") and at line breaks
+    parts = re.split(r"(?<=[.!?])(?<!^\d\.)(?<!^\d\d\.)\s+|\n", text, flags=re.MULTILINE)
+    sentences = [s.strip().lstrip("-• ") for s in parts]
+    return [s for s in sentences if s]
+
+def join_sentences(sentences):
+    """Joins sentences, adding '; ' after ones with no ending punctuation ("Range: 60 feet")."""
+    text = ""
+    for s in sentences:
+        if text:
+            text += " " if text.endswith((".", "!", "?")) else "; "
+        text += s
+    return text
+
+def build_index(filename):
+    """Reads one knowledge file and builds its summaries + fact index."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        raw = f.read()
+
+    index = {"version": CACHE_VERSION, "sha256": file_hash(filename),
+             "source": os.path.basename(filename), "raw_chars": len(raw),
+             "title": "", "sections": [], "facts": [], "entities": {}}
+
+    first_line = True
+    heading = ""  # A heading alone in its block, e.g. "INTERROGATION TRANSCRIPT (...):"
+    for block in re.split(r"\n\s*\n", raw):
+        lines = []
+        for line in block.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if BOILERPLATE.search(line):
+                first_line = False
+                continue  # Banners repeat on every query: drop them
+            if line.startswith(("[", "--")):
+                line = line.strip("[]- ")  # "[DATE: ...]" / "--- HEADING ---"
+            if first_line:
+                # The first line of the file names the document
+                index["title"] = line
+                first_line = False
+                continue
+            lines.append(line)
+        if not lines:
+            continue
+        if len(lines) == 1 and lines[0].endswith(":"):
+            heading = lines[0]
+            continue
+
+        # Transcripts: the same speaker ("SUSPECT: ...") on several lines
+        speakers = [m.group(1) for m in map(SPEAKER.match, lines) if m]
+        repeated = {k for k in speakers if speakers.count(k) > 1}
+        def is_dialogue(line):
+            m = SPEAKER.match(line)
+            return bool(m and m.group(1) in repeated)
+
+        section_id = len(index["sections"])
+        if heading:
+            title, body, text = heading.rstrip(":"), lines, "\n".join([heading] + lines)
+        elif is_dialogue(lines[0]):
+            title, body, text = "Transcript", lines, "\n".join(lines)
+        else:
+            title, body, text = lines[0].rstrip(":"), lines[1:], "\n".join(lines)
+        heading = ""
+
+        # 1. Exact facts: "KEY: value" lines and sentences with dates/amounts/codes
+        for line in lines:
+            if is_dialogue(line):
+                continue  # What someone *said* is not a fact
+            if KEY_VALUE.match(line) or FACT_PATTERN.search(line):
+                index["facts"].append({"text": line.lstrip("-• "), "section": section_id})
+
+        # 2. Entities (people, places...) -> which sections mention them
+        for name in NAME_PATTERN.findall(text):
+            sections = index["entities"].setdefault(name, [])
+            if section_id not in sections:
+                sections.append(section_id)
+
+        # 3. Summary: the first sentence plus the most fact-heavy ones
+        #    (transcripts: just the opening line, the rest is picked per question)
+        if repeated:
+            sentences = body  # Keep each speaker's line whole
+            summary = sentences[0] if sentences else ""
+        else:
+            sentences = split_sentences("\n".join(body))
+            ranked = sorted(sentences, key=lambda s: -len(FACT_PATTERN.findall(s)))
+            keep = sentences[:1] + [s for s in ranked if s not in sentences[:1]]
+            keep = keep[:SUMMARY_SENTENCES]
+            summary = join_sentences(s for s in sentences if s in keep)
+
+        index["sections"].append({"title": title, "summary": summary, "text": text,
+                                  "sentences": sentences, "dialogue": bool(repeated)})
+
+    return index
+
+def cache_path(filename):
+    folder = os.path.join(os.path.dirname(os.path.abspath(filename)), CACHE_DIR)
+    return os.path.join(folder, os.path.basename(filename) + ".json")
+
+def load_index(filename):
+    """Returns the cached index for a file, rebuilding it if the file changed."""
+    path = cache_path(filename)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get("version") == CACHE_VERSION and index.get("sha256") == file_hash(filename):
+                return index
+        except Exception:
+            pass  # Broken cache: just rebuild it
+
+    index = build_index(filename)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+    except Exception:
+        pass  # Read-only folder: still usable, just not cached
+    return index
+
+def full_text(index):
+    """The whole file without boilerplate, for questions that need every detail."""
+    parts = [index["title"]] if index["title"] else []
+    return "\n\n".join(parts + [s["text"] for s in index["sections"]])
+
+def compress_context(question, index):
+    """Builds a small context: summaries + exact facts of the sections that match."""
+    words = keywords(question)
+    sections = index["sections"]
+
+    # Score sections by overlap with the question (named entities count extra),
+    # then keep the ones at least half as relevant as the best
+    scores = [len(words & keywords(s["title"] + " " + s["text"])) for s in sections]
+    for name, found_in in index["entities"].items():
+        if keywords(name) & words:
+            for i in found_in:
+                scores[i] += 1
+    best = max(scores, default=0)
+
+    # Weak match: the summaries probably miss the answer, send everything
+    if not words or best < len(words) * MIN_MATCH:
+        return full_text(index)
+    chosen = [i for i in sorted(range(len(scores)), key=lambda i: -scores[i])
+              if best and scores[i] * 2 >= best][:MAX_SECTIONS]
+
+    # Exact facts and sentences from those sections, most relevant first
+    matches = {}
+    for i in chosen:
+        candidates = [f["text"] for f in index["facts"] if f["section"] == i]
+        for text in candidates + sections[i]["sentences"]:
+            # In transcripts, match on what was said, not on who said it
+            # (unless the question asks what someone said)
+            said = text
+            if sections[i]["dialogue"] and not words & keywords(" ".join(SAY_WORDS)):
+                said = SPEAKER.sub("", text)
+            score = len(words & keywords(said))
+            if score and text not in matches:
+                matches[text] = (score, i)
+    picked = sorted(matches, key=lambda t: -matches[t][0])[:MAX_FACTS]
+
+    # One line per section: title, summary, then any facts the summary is missing
+    lines = [index["title"]] if index["title"] else []
+    for i in sorted(chosen):
+        s = sections[i]
+        if s["dialogue"]:
+            # Transcripts stay in the order things were said
+            said = [t for t in s["sentences"] if t == s["summary"] or t in picked]
+            lines.append(f"- {s['title']}: {join_sentences(said)}")
+            continue
+        mine = [t for t in matches if t in picked and matches[t][1] == i]  # File order
+        extra = [t for t in mine if t != s["title"] and t not in s["summary"]
+                 and not any(t != u and t in u for u in mine)]
+        summary = s["summary"]
+        if any(summary in t for t in extra):
+            summary = ""  # A fact already says it all
+        body = join_sentences(filter(None, [summary] + extra))
+        lines.append(f"- {s['title']}: {body}" if body else f"- {s['title']}")
+    compressed = "\n".join(lines)
+
+    # Never send more than the cleaned file itself
+    cleaned = full_text(index)
+    return compressed if len(compressed) < len(cleaned) else cleaned
+
+# ==========================================
+# 🚀  RUN AS A SCRIPT: pre-process every .txt file
+# ==========================================
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".txt"):
+            continue
+        index = load_index(os.path.join(folder, name))
+        print(f"🗜️  {name}: {len(index['sections'])} sections, "
+              f"{len(index['facts'])} facts, {len(index['entities'])} entities, "
+              f"{index['raw_chars']} -> {len(full_text(index))} chars without boilerplate")
+    print(f"✅ Saved to {os.path.join(folder, CACHE_DIR)}")
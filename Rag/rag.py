@@ -1,7 +1,11 @@
 import requests
 import json
 import os
+import re
 import sys
+import time
+
+from preprocess import load_index, compress_context, full_text, keywords, split_sentences
 
 # ==========================================
 # 🎛️  CONTROL PANEL (EDIT THIS SECTION)
@@ -10,6 +14,12 @@ import sys
 # 1. THE BRAIN: Which AI model are we using?
 MODEL_NAME = "llama3.2"  # Options: 'llama3.2', 'tinyllama', 'phi3'
 
+# 1b. AUTO ROUTING: Let the program pick the model for each question?
+# Short factual lookups go to FAST_MODEL. Harder questions, or a role that asks for
+# analysis (like the Detective below), go to MODEL_NAME.
+AUTO_ROUTE = True
+FAST_MODEL = "tinyllama"
+
 # 2. THE KNOWLEDGE: What file should the AI read?
 DATA_FILENAME = "ts.txt"  # Change this to your .txt file name
 
@@ -17,11 +27,32 @@ DATA_FILENAME = "ts.txt"  # Change this to your .txt file name
 # Try changing this! Examples: "A grumpy pirate", "A helpful wizard", "A strict detective"
 AI_SYSTEM_ROLE = "You are a Detective. Analyze the suspect's statement for inconsistencies."
 
+# 4. THE SHORTCUT: Send precomputed summaries + exact facts instead of the whole file?
+# Built by preprocess.py (and rebuilt automatically when the file changes).
+USE_SUMMARIES = True
+
 # ==========================================
 # 🛠️  SYSTEM SETTINGS (DO NOT EDIT)
 # ==========================================
 API_URL = "http://localhost:11434/api/generate"
 
+# Context window (in tokens) we ask Ollama to use for each model
+MODEL_NUM_CTX = {
+    "tinyllama": 2048,
+    "phi3": 4096,
+    "llama3.1": 8192,
+    "llama3.2": 4096,
+}
+OLLAMA_DEFAULT_CTX = 2048    # Ollama's own window for models not listed above
+ANSWER_TOKENS = 256          # Room left in the window for the answer
+COMPLEX_QUESTION_WORDS = 15  # Questions longer than this go to the big model
+# Word starts that mark a question (or a role) as needing judgement, not a lookup
+COMPLEX_KEYWORDS = ["why", "explain", "compare", "summar", "analy", "inconsisten",
+                    "consisten", "differen", "contradict", "lying", "lie", "lied",
+                    "alibi", "true", "truth", "believ", "suspicious"]
+SUMMARIZE_ABOVE = 0.25       # Use summaries only if the file fills > 25% of the window
+ROUTING_LOG = "routing_log.csv"  # Routing decisions + latency, for tuning
+
 # Terminal Colors for a "Pro" look
 class Colors:
     HEADER = '\033[95m'
@@ -46,9 +77,132 @@ def load_knowledge_base(filename):
         print(f"{Colors.RED}❌ Error reading file: {e}{Colors.RESET}")
         sys.exit(1)
 
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English)."""
+    return len(text) // 4 + 1
+
+def mentions_judgement(text):
+    """True if any word in the text starts with one of COMPLEX_KEYWORDS."""
+    words = re.findall(r"[a-z']+", text.lower())
+    return any(w.startswith(k) for w in words for k in COMPLEX_KEYWORDS)
+
+def is_complex_question(question):
+    """Returns why a question needs the big model (or None for a simple lookup)."""
+    if mentions_judgement(AI_SYSTEM_ROLE):
+        return "role asks for analysis"
+    if len(question.split()) > COMPLEX_QUESTION_WORDS:
+        return "long question"
+    if mentions_judgement(question):
+        return "complex question"
+    return None
+
+def choose_model(question, context):
+    """Picks the fastest model that should be good enough for this question."""
+    if not AUTO_ROUTE:
+        return MODEL_NAME, "fixed"
+
+    reason = is_complex_question(question)
+    if reason:
+        return MODEL_NAME, reason
+
+    # A short lookup only needs the fast model if the data fits its window
+    budget = MODEL_NUM_CTX.get(FAST_MODEL, OLLAMA_DEFAULT_CTX) - ANSWER_TOKENS
+    if estimate_tokens(context) + estimate_tokens(question) > budget:
+        return MODEL_NAME, "context too big for fast model"
+    return FAST_MODEL, "short lookup"
+
+def fit_context(question, context, max_tokens):
+    """Trims the context to fit the model's window, keeping the most relevant parts."""
+    if estimate_tokens(context) <= max_tokens:
+        return context, False
+
+    words = keywords(question)
+
+    def relevance(text):
+        return len(words & keywords(text))
+
+    # Keep the paragraphs that share the most question words; if not even one
+    # paragraph fits, do the same with whole sentences (never cut mid-sentence)
+    paragraphs = [b for b in context.split("\n\n") if b.strip()]
+    for blocks, joiner in ((paragraphs, "\n\n"), (split_sentences(context), "\n")):
+        ranked = sorted(range(len(blocks)), key=lambda i: -relevance(blocks[i]))
+        keep, used = [], 0
+        for i in ranked:
+            cost = estimate_tokens(blocks[i])
+            if used + cost > max_tokens:
+                continue
+            keep.append(i)
+            used += cost
+        if keep:
+            # Put them back in file order
+            return joiner.join(blocks[i] for i in sorted(keep)), True
+
+    # Not even one sentence fits: cut the most relevant paragraph at the budget
+    # (at a word boundary) rather than sending no data at all
+    if not paragraphs:
+        return "", True
+    best = max(paragraphs, key=relevance)
+    return best[:max(max_tokens, 1) * 4].rsplit(" ", 1)[0], True
+
+def pick_context(question, index):
+    """Full text for hard questions and small files, summaries + facts otherwise."""
+    cleaned = full_text(index)
+    models = [FAST_MODEL, MODEL_NAME] if AUTO_ROUTE else [MODEL_NAME]
+    window = min(MODEL_NUM_CTX.get(m, OLLAMA_DEFAULT_CTX) for m in models)
+    if is_complex_question(question) or estimate_tokens(cleaned) <= window * SUMMARIZE_ABOVE:
+        return cleaned
+    return compress_context(question, index)
+
+def log_routing(question, model, reason, prompt_tokens, trimmed, latency, result):
+    """Appends one routing decision to ROUTING_LOG (CSV) so thresholds can be tuned."""
+    new_file = not os.path.exists(ROUTING_LOG)
+    try:
+        with open(ROUTING_LOG, 'a', encoding='utf-8') as f:
+            if new_file:
+                f.write("time,model,reason,question_words,est_prompt_tokens,"
+                        "prompt_eval_count,trimmed,latency_s,prompt_eval_s\n")
+            prompt_eval_s = result.get('prompt_eval_duration', 0) / 1e9
+            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')},{model},{reason},"
+                    f"{len(question.split())},{prompt_tokens},"
+                    f"{result.get('prompt_eval_count', '')},{trimmed},"
+                    f"{latency:.2f},{prompt_eval_s:.2f}\n")
+    except Exception:
+        pass  # Logging must never break the chat
+
 def query_local_ai(question, context):
-    """Sends the package (Question + Context) to Ollama."""
-    
+    """Sends the package (Question + Context) to Ollama. Returns (answer, model)."""
+    model, reason = choose_model(question, context)
+    try:
+        try:
+            return ask_model(question, context, model, reason), model
+        except requests.exceptions.HTTPError as e:
+            missing = e.response is not None and e.response.status_code == 404
+            if not missing or model == MODEL_NAME:
+                raise
+            # The fast model isn't installed: fall back to the main one
+            print(f"\r{Colors.YELLOW}⚠️  '{model}' not found (run 'ollama pull {model}'), using {MODEL_NAME}...{Colors.RESET}")
+            model = MODEL_NAME
+            return ask_model(question, context, model, "fallback: fast model missing"), model
+
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return f"{Colors.RED}❌ ERROR: Model '{model}' not found. Run 'ollama pull {model}' first.{Colors.RESET}", model
+        return f"{Colors.RED}❌ ERROR: Ollama returned an error: {e}{Colors.RESET}", model
+
+    except requests.exceptions.ConnectionError:
+        return f"{Colors.RED}❌ ERROR: Is Ollama running? Try typing 'ollama serve' in a new terminal.{Colors.RESET}", model
+
+def ask_model(question, context, model, reason):
+    """Builds the prompt for one model, sends it, and returns the answer text."""
+
+    # Make sure the data fits inside the model's context window
+    num_ctx = MODEL_NUM_CTX.get(model)
+    overhead = estimate_tokens(AI_SYSTEM_ROLE) + estimate_tokens(question) + 32
+    budget = (num_ctx or OLLAMA_DEFAULT_CTX) - ANSWER_TOKENS - overhead
+    context, trimmed = fit_context(question, context, budget)
+    if trimmed:
+        print(f"\r{Colors.YELLOW}✂️  Data too long for {model}: sending only the most relevant parts.{Colors.RESET}")
+
     # This is the "Magic Trick" of RAG.
     # We combine the System Role, the Secret Data, and the Question into one big prompt.
     full_prompt = f"""
@@ -63,18 +217,20 @@ def query_local_ai(question, context):
     """
 
     payload = {
-        "model": MODEL_NAME,
+        "model": model,
         "prompt": full_prompt,
         "stream": False
     }
+    if num_ctx:
+        payload["options"] = {"num_ctx": num_ctx}  # Unknown models keep Ollama's default
 
-    try:
-        response = requests.post(API_URL, json=payload)
-        response.raise_for_status() # Check for HTTP errors
-        return response.json()['response']
-        
-    except requests.exceptions.ConnectionError:
-        return f"{Colors.RED}❌ ERROR: Is Ollama running? Try typing 'ollama serve' in a new terminal.{Colors.RESET}"
+    start = time.time()
+    response = requests.post(API_URL, json=payload)
+    response.raise_for_status() # Check for HTTP errors
+    result = response.json()
+    log_routing(question, model, reason, estimate_tokens(full_prompt),
+                trimmed, time.time() - start, result)
+    return result['response']
 
 # ==========================================
 # 🚀  MAIN PROGRAM EXECUTION
@@ -86,7 +242,7 @@ if __name__ == "__main__":
     print(f"{Colors.HEADER}{Colors.BOLD}╔══════════════════════════════════════════╗{Colors.RESET}")
     print(f"{Colors.HEADER}{Colors.BOLD}║     🔒  LOCAL RAG SYSTEM: ONLINE         ║{Colors.RESET}")
     print(f"{Colors.HEADER}{Colors.BOLD}╚══════════════════════════════════════════╝{Colors.RESET}")
-    print(f" ► Model:   {Colors.GREEN}{MODEL_NAME}{Colors.RESET}")
+    print(f" ► Model:   {Colors.GREEN}{MODEL_NAME}{Colors.RESET}" + (f" (auto: {FAST_MODEL} for quick lookups)" if AUTO_ROUTE else ""))
     print(f" ► Source:  {Colors.BLUE}{DATA_FILENAME}{Colors.RESET}")
     print(f" ► Role:    {Colors.YELLOW}{AI_SYSTEM_ROLE}{Colors.RESET}")
     print("-" * 50)
@@ -96,6 +252,14 @@ if __name__ == "__main__":
     context_data = load_knowledge_base(DATA_FILENAME)
     print(f"{Colors.GREEN}Success!{Colors.RESET}")
 
+    # 1b. Load (or build) the summaries + fact index
+    knowledge_index = None
+    if USE_SUMMARIES:
+        print("🗜️  Loading summaries & facts...", end=" ")
+        knowledge_index = load_index(DATA_FILENAME)
+        print(f"{Colors.GREEN}{len(knowledge_index['sections'])} sections, "
+              f"{len(knowledge_index['facts'])} facts{Colors.RESET}")
+
     # 2. Start the Loop
     print(f"\n{Colors.BOLD}Type 'exit' to quit.{Colors.RESET}")
     
@@ -114,11 +278,16 @@ if __name__ == "__main__":
             # Processing Animation
             print(f"{Colors.YELLOW}⚡ AI is thinking...{Colors.RESET}", end="", flush=True)
 
+            # Pick the context: exact facts/summaries for lookups in big files
+            context = context_data
+            if knowledge_index is not None:
+                context = pick_context(user_input, knowledge_index)
+
             # Get Answer
-            answer = query_local_ai(user_input, context_data)
+            answer, used_model = query_local_ai(user_input, context)
             
             # Print Answer (erase the "thinking" line first)
-            print(f"\r{Colors.GREEN}🤖 AI ({MODEL_NAME}):{Colors.RESET} {answer}")
+            print(f"\r{Colors.GREEN}🤖 AI ({used_model}):{Colors.RESET} {answer}")
 
         except KeyboardInterrupt:
             print("\n\n👋 Forced exit detected. Goodbye!")